@@ -27,17 +27,23 @@ import asyncio
 import enum
 import logging
 import types
+import warnings
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 import yaml
-from astropy import units
 from lsst.ts import tcpip, utils
 from lsst.ts.ess import common
 
 if TYPE_CHECKING:
     from lsst.ts import salobj
 
+# Use the libyaml based loader, if available, to parse the config schema.
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader  # type: ignore[assignment]
+
 # The standard TCP/IP line terminator (bytes).
 TERMINATOR = b"\n"
 
@@ -49,73 +55,24 @@ QUERY_TRACE_DATA_CMD = ":trace:data? 1"
 SET_FREQ_START_CMD = ":frequency:start 0.0 GHz"
 SET_FREQ_STOP_CMD = ":frequency:stop 3.0 GHz"
 
+# The same commands, encoded and terminated, ready to be written as is.
+QUERY_TRACE_DATA_BYTES = QUERY_TRACE_DATA_CMD.encode() + b"\r\n"
+# The commands sent by setup_reading, combined so they need only one write.
+SETUP_READING_BYTES = f"{SET_FREQ_START_CMD}\r\n{SET_FREQ_STOP_CMD}\r\n".encode()
 
-class FreqUnit(enum.Enum):
-    GHz = enum.auto()
-    MHz = enum.auto()
-    kHz = enum.auto()
-    Hz = enum.auto()
-
-
-class SiglentSSA3000xSpectrumAnalyzerDataClient(
-    common.data_client.BaseReadLoopDataClient
-):
-    """Get data from a Siglent SSA3000X Spectrum analyzer.
 
-    Parameters
-    ----------
-    config : types.SimpleNamespace
-        The configuration, after validation by the schema returned
-        by `get_config_schema` and conversion to a types.SimpleNamespace.
-    topics : `salobj.Controller` or `types.SimpleNamespace`
-        The telemetry topics this data client can write,
-        as a struct with attributes such as ``tel_spectrumAnalyzer``.
-    log : `logging.Logger`
-        Logger.
-    simulation_mode : `int`, optional
-        Simulation mode; 0 for normal operation.
-    """
-
-    ###########################################################################
-    # The following constants need to be hard coded because of limitations in #
-    # the way DDS handles arrays. This ensures that all arrays always have    #
-    # the same, fixed, length.                                                #
-    ###########################################################################
-    # The commands to use with the spectrum analyzer.
-    query_trace_data_cmd = ":trace:data? 1"
-    set_freq_start_cmd = ":frequency:start 0.0 GHz"
-    set_freq_stop_cmd = ":frequency:stop 3.0 GHz"
-    # The start and stop frequencies as float values.
-    start_frequency = 0.0
-    stop_frequency = 3.0e9
-
-    def __init__(
-        self,
-        config: types.SimpleNamespace,
-        topics: salobj.Controller | types.SimpleNamespace,
-        log: logging.Logger,
-        simulation_mode: int = 0,
-    ) -> None:
-        super().__init__(
-            config=config, topics=topics, log=log, simulation_mode=simulation_mode
-        )
-
-        self.topics.tel_spectrumAnalyzer.set(
-            sensorName=self.config.sensor_name, location=self.config.location
-        )
+class FreqUnit(enum.Enum):
+    """Frequency units; the value of each is its size in Hz."""
 
-        # Lock for TCP/IP communication
-        self.stream_lock = asyncio.Lock()
+    GHz = 1.0e9
+    MHz = 1.0e6
+    kHz = 1.0e3
+    Hz = 1.0
 
-        self.client: tcpip.Client | None = None
-        self.mock_data_server: MockSiglentSSA3000xDataServer | None = None
-        self._have_seen_data = False
-        self.simulation_interval = 0.5
 
-    @classmethod
-    def get_config_schema(cls) -> dict[str, Any]:
-        return yaml.safe_load(
-            f"""
+# The configuration schema is static, so parse it only once.
+CONFIG_SCHEMA: dict[str, Any] = yaml.load(
+    f"""
 $schema: http://json-schema.org/draft-07/schema#
 description: Schema for SiglentSSA3000xSpectrumAnalyzerDataClient
 type: object
@@ -179,9 +136,74 @@ required:
   - sensor_name
   - poll_interval
 additionalProperties: false
-"""
+""",
+    Loader=YamlLoader,
+)
+
+
+class SiglentSSA3000xSpectrumAnalyzerDataClient(
+    common.data_client.BaseReadLoopDataClient
+):
+    """Get data from a Siglent SSA3000X Spectrum analyzer.
+
+    Parameters
+    ----------
+    config : types.SimpleNamespace
+        The configuration, after validation by the schema returned
+        by `get_config_schema` and conversion to a types.SimpleNamespace.
+    topics : `salobj.Controller` or `types.SimpleNamespace`
+        The telemetry topics this data client can write,
+        as a struct with attributes such as ``tel_spectrumAnalyzer``.
+    log : `logging.Logger`
+        Logger.
+    simulation_mode : `int`, optional
+        Simulation mode; 0 for normal operation.
+    """
+
+    ###########################################################################
+    # The following constants need to be hard coded because of limitations in #
+    # the way DDS handles arrays. This ensures that all arrays always have    #
+    # the same, fixed, length.                                                #
+    ###########################################################################
+    # The commands to use with the spectrum analyzer.
+    query_trace_data_cmd = QUERY_TRACE_DATA_CMD
+    set_freq_start_cmd = SET_FREQ_START_CMD
+    set_freq_stop_cmd = SET_FREQ_STOP_CMD
+    # The start and stop frequencies as float values.
+    start_frequency = 0.0
+    stop_frequency = 3.0e9
+
+    def __init__(
+        self,
+        config: types.SimpleNamespace,
+        topics: salobj.Controller | types.SimpleNamespace,
+        log: logging.Logger,
+        simulation_mode: int = 0,
+    ) -> None:
+        super().__init__(
+            config=config, topics=topics, log=log, simulation_mode=simulation_mode
+        )
+
+        # The start and stop frequencies are fixed by the configuration,
+        # so convert them to Hz only once.
+        freq_start_unit = FreqUnit[self.config.freq_start_unit]
+        freq_stop_unit = FreqUnit[self.config.freq_stop_unit]
+        self.topics.tel_spectrumAnalyzer.set(
+            sensorName=self.config.sensor_name,
+            location=self.config.location,
+            startFrequency=self.config.freq_start_value * freq_start_unit.value,
+            stopFrequency=self.config.freq_stop_value * freq_stop_unit.value,
         )
 
+        self.client: tcpip.Client | None = None
+        self.mock_data_server: MockSiglentSSA3000xDataServer | None = None
+        self._have_seen_data = False
+        self.simulation_interval = 0.5
+
+    @classmethod
+    def get_config_schema(cls) -> dict[str, Any]:
+        return CONFIG_SCHEMA
+
     def descr(self) -> str:
         assert self.client is not None  # keep mypy happy
         return f"host={self.client.host}, port={self.client.port}"
@@ -280,68 +302,86 @@ additionalProperties: false
         data : `str`
             The data to write.
         """
+        await self.write_bytes(data.encode() + b"\r\n")
+
+    async def write_bytes(self, data: bytes) -> None:
+        """Write data that already is encoded and terminated.
+
+        Parameters
+        ----------
+        data : `bytes`
+            The data to write.
+        """
         assert self.client is not None  # make mypy happy
-        await self.client.write(data.encode() + b"\r\n")
+        await self.client.write(data)
 
     async def setup_reading(self) -> None:
         self._have_seen_data = False
         if self.connected:
-            await self.write(SET_FREQ_START_CMD)
-            await self.write(SET_FREQ_STOP_CMD)
+            await self.write_bytes(SETUP_READING_BYTES)
 
     async def read_data(self) -> None:
         """Read raw data from the SSA3000X Spectrum Analyzer."""
+        client = self.client
+        assert client is not None  # make mypy happy
+        config = self.config
+        loop = asyncio.get_running_loop()
+        poll_start_time = loop.time()
         timestamp = utils.current_tai()
-        await self.write(QUERY_TRACE_DATA_CMD)
-        assert self.client is not None  # make mypy happy
+        await client.write(QUERY_TRACE_DATA_BYTES)
         try:
-            read_bytes = await asyncio.wait_for(
-                self.client.readuntil(TERMINATOR),
-                timeout=self.config.read_timeout,
-            )
+            async with asyncio.timeout(config.read_timeout):
+                read_bytes = await client.readuntil(TERMINATOR)
         except Exception:
             self._have_seen_data = False
             raise
-        raw_data = read_bytes.decode().strip()
-        raw_data_items = raw_data.split(",")
-        # The data from the spectrum analyzer ends in a "," so the last item
-        # will be an empty string and needs to be dropped.
-        if raw_data_items[-1] == "":
-            del raw_data_items[-1]
-        data = [float(i.strip()) for i in raw_data_items]
-        if len(data) < EXPECTED_NUMBER_OF_DATA_POINTS and not self._have_seen_data:
-            logging.warning(
-                f"Data of length {len(data)} read. Ignoring because this is the first time data was read."
+        # The data from the spectrum analyzer ends in a "," which needs to be
+        # dropped, together with the terminator, before parsing.
+        raw_data = read_bytes.rstrip(b" ,\r\n\t")
+        # Count the data points before parsing them, so that truncated data
+        # is rejected without the cost of parsing it.
+        num_data_points = raw_data.count(b",") + 1 if raw_data else 0
+        if (
+            num_data_points < EXPECTED_NUMBER_OF_DATA_POINTS
+            and not self._have_seen_data
+        ):
+            self.log.warning(
+                f"Data of length {num_data_points} read. Ignoring because this "
+                "is the first time data was read."
             )
             self._have_seen_data = True
-        elif len(data) != EXPECTED_NUMBER_OF_DATA_POINTS:
+        elif num_data_points != EXPECTED_NUMBER_OF_DATA_POINTS:
             raise RuntimeError(
-                f"Encountered {len(data)} data points instead of "
+                f"Encountered {num_data_points} data points instead of "
                 f"{EXPECTED_NUMBER_OF_DATA_POINTS}. Check the Spectrum "
                 f"Analyzer and the configuration."
             )
         else:
+            with warnings.catch_warnings():
+                # Older versions of numpy only warn about data that cannot be
+                # parsed, and return a truncated array; treat that as an error.
+                warnings.simplefilter("error", DeprecationWarning)
+                try:
+                    data = np.fromstring(raw_data, dtype=np.float64, sep=",")
+                except (ValueError, DeprecationWarning) as e:
+                    raise RuntimeError(
+                        "Could not parse all the data points read."
+                    ) from e
+            if data.size != EXPECTED_NUMBER_OF_DATA_POINTS:
+                raise RuntimeError("Could not parse all the data points read.")
             try:
                 await self.topics.tel_spectrumAnalyzer.set_write(
-                    startFrequency=(
-                        self.config.freq_start_value
-                        * getattr(units, self.config.freq_start_unit)
-                    )
-                    .to(units.Hz)
-                    .value,
-                    stopFrequency=(
-                        self.config.freq_stop_value
-                        * getattr(units, self.config.freq_stop_unit)
-                    )
-                    .to(units.Hz)
-                    .value,
-                    spectrum=data,
+                    spectrum=data.tolist(),
                     timestamp=timestamp,
                 )
             except Exception as e:
                 self.log.exception(f"Failed to handle {data=}: {e!r}")
 
-        await asyncio.sleep(self.config.poll_interval)
+        # Measure the poll interval from the start of this poll, so that the
+        # time taken by the query does not add to it.
+        await asyncio.sleep(
+            max(0.0, poll_start_time + config.poll_interval - loop.time())
+        )
 
 
 class MockSiglentSSA3000xDataServer(tcpip.OneClientReadLoopServer):
@@ -368,11 +408,16 @@ class MockSiglentSSA3000xDataServer(tcpip.OneClientReadLoopServer):
         self.simulation_interval = simulation_interval
         self.write_loop_task = utils.make_done_future()
 
+        # The random seed is fixed, so every trace is the same;
+        # generate and encode it only once.
+        rng = np.random.default_rng(10)
+        data = -100.0 * rng.random(EXPECTED_NUMBER_OF_DATA_POINTS)
+        self.trace_data = (
+            ", ".join(f"{d:0.3f}" for d in data).encode() + tcpip.DEFAULT_TERMINATOR
+        )
+
     async def read_and_dispatch(self) -> None:
         command = await self.read_str()
         if command == QUERY_TRACE_DATA_CMD:
             await asyncio.sleep(self.simulation_interval)
-            rng = np.random.default_rng(10)
-            data = -100.0 * rng.random(EXPECTED_NUMBER_OF_DATA_POINTS)
-            data_string = ", ".join(f"{d:0.3f}" for d in data)
-            await self.write_str(data_string)
+            await self.write(self.trace_data)
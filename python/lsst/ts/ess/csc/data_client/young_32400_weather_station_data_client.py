@@ -30,18 +30,16 @@ __all__ = [
 import asyncio
 import collections.abc
 import dataclasses
-import itertools
 import logging
 import math
 import re
+import statistics
 import types
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
-import astropy.units as u
 import numpy as np
 import numpy.random
 import yaml
-from astropy.coordinates import Angle
 from lsst.ts import tcpip
 from lsst.ts.ess import common
 from lsst.ts.ess.common.sensor import compute_dew_point_magnus
@@ -50,6 +48,12 @@ from lsst.ts.utils import current_tai, make_done_future
 if TYPE_CHECKING:
     from lsst.ts import salobj
 
+# Use the libyaml based loader, if available, to parse the config schema.
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader  # type: ignore[assignment]
+
 # Maximum reported rain tip count before the value wraps around.
 MAX_RAIN_TIP_COUNT = 9999
 
@@ -64,13 +68,15 @@ SECONDS_PER_HOUR = 60 * 60
 # * humidity: 0-4000 = 0-1V = 0-100% humidity
 # * pressure: 0-5000 = 0-1V; scale and offset are configurable in the sensor
 # * rain: 0-9999 (=MAX_RAIN_TIP_COUNT) tipping bucket tip count
+#
+# The pattern is bytes, so the raw data can be parsed without decoding it.
 DATA_REGEX = re.compile(
-    r"(. )?(?P<wind_speed>\d\d\d\d) "
-    r"(?P<wind_direction>\d\d\d\d) "
-    r"(?P<temperature>\d\d\d\d) "
-    r"(?P<humidity>\d\d\d\d) "
-    r"(?P<pressure>\d\d\d\d) "
-    r"(?P<rain_tip_count>\d\d\d\d)"
+    rb"(?:. )?(?P<wind_speed>\d\d\d\d) "
+    rb"(?P<wind_direction>\d\d\d\d) "
+    rb"(?P<temperature>\d\d\d\d) "
+    rb"(?P<humidity>\d\d\d\d) "
+    rb"(?P<pressure>\d\d\d\d) "
+    rb"(?P<rain_tip_count>\d\d\d\d)"
 )
 
 
@@ -83,6 +89,8 @@ class FloatAccumulator:
         Number of samples to accumulate. Must be positive.
     """
 
+    __slots__ = ("num_samples", "values")
+
     def __init__(self, num_samples: int) -> None:
         if num_samples < 1:
             raise ValueError(f"{num_samples=} must be >= 1")
@@ -106,8 +114,10 @@ class FloatAccumulator:
         """
         self.values.append(value)
         if len(self.values) >= self.num_samples:
-            # The explicit cast to float is needed by mypy
-            median = float(np.median(self.values))
+            # statistics.median is much faster than np.median for the small
+            # number of samples accumulated here. It returns an int for an
+            # odd number of int samples, hence the explicit cast to float.
+            median = float(statistics.median(self.values))
             self.clear()
             return median
         return None
@@ -117,178 +127,9 @@ class FloatAccumulator:
         self.values = []
 
 
-def float_to_intstr(value: float, max_int: int) -> str:
-    """Return a float value converted to an string representation
-    of an integer with 4 chars and leading zeros.
-
-    Parameters
-    ----------
-    value : `float`
-        The value to convert.
-    max_int : `int`
-        The maximum integer value. Must be > 0 and <= 9999.
-
-    Raises
-    ------
-    ValueError
-        If max_int <= 0 or > 9999.
+# Configuration schema for the data client, parsed once at import time.
+CONFIG_SCHEMA: dict[str, Any] = yaml.load(
     """
-    if not 0 < max_int <= 9999:
-        raise ValueError(f"{max_int=} not >0 and <= 9999")
-    int_val = int(round(value))
-    truncated_int_val = max(0, min(int_val, max_int))
-    return f"{truncated_int_val:04d}"
-
-
-def scaled_from_raw(raw: float, scale: float, offset: float) -> float:
-    """Convert raw data to scaled: return raw * scale + offset."""
-    return raw * scale + offset
-
-
-class Young32400WeatherStationDataClient(common.data_client.BaseReadLoopDataClient):
-    """Get environmental data from Young 32400 weather station
-    serial interface.
-
-    The interface is assumed to be connected to a serial-to-ethernet adapter.
-
-    Parameters
-    ----------
-    config : types.SimpleNamespace
-        The configuration, after validation by the schema returned
-        by `get_config_schema` and conversion to a types.SimpleNamespace.
-    topics : `salobj.Controller` or `types.SimpleNamespace`
-        The telemetry topics this data client can write,
-        as a struct with attributes such as ``tel_temperature``.
-    log : `logging.Logger`
-        Logger.
-    simulation_mode : `int`, optional
-        Simulation mode; 0 for normal operation.
-
-    Notes
-    -----
-    This code assumes the 32400 is configured to provide ASCII or
-    PRECIPITATION formatted output, depending if there is a rain gauge.
-
-    Sensors must be connected as follows (this is the standard order
-    for NMEA output, plus the standard input for a rain gauge):
-
-    * VIN1: temperature
-    * VIN2: relative humidity
-    * VIN3: barometric pressure
-    * VIN4: tipping bucket rain gauge
-    """
-
-    def __init__(
-        self,
-        config: types.SimpleNamespace,
-        topics: salobj.Controller | types.SimpleNamespace,
-        log: logging.Logger,
-        simulation_mode: int = 0,
-    ) -> None:
-        if config.rain_stopped_interval <= config.read_timeout:
-            raise ValueError(
-                f"{config.rain_stopped_interval=} must be > {config.read_timeout=}"
-            )
-        if config.sensor_name_dew_point and (
-            not config.sensor_name_humidity or not config.sensor_name_temperature
-        ):
-            raise ValueError(
-                f"{config.sensor_name_dew_point=} must be blank unless both "
-                f"{config.sensor_name_humidity=} and "
-                f"{config.sensor_name_temperature=} are specified"
-            )
-
-        # The MOXA serial-to-ethernet adapter connected to the Young weather
-        # station requires disconnecting and reconnecting again when the
-        # connection times out. This is achieved by setting the auto_reconnect
-        # constructor argument to True.
-        super().__init__(
-            config=config,
-            topics=topics,
-            log=log,
-            simulation_mode=simulation_mode,
-            auto_reconnect=True,
-        )
-
-        self.topics.tel_airFlow.set(
-            sensorName=self.config.sensor_name_airflow, location=self.config.location
-        )
-        self.topics.tel_dewPoint.set(
-            sensorName=self.config.sensor_name_dew_point, location=self.config.location
-        )
-        self.topics.tel_relativeHumidity.set(
-            sensorName=self.config.sensor_name_humidity, location=self.config.location
-        )
-        num_pressures = len(self.topics.tel_pressure.DataType().pressureItem)
-        self.topics.tel_pressure.set(
-            sensorName=self.config.sensor_name_pressure,
-            location=self.config.location,
-            pressureItem=[math.nan] * num_pressures,
-            numChannels=1,
-        )
-        self.topics.tel_rainRate.set(
-            sensorName=self.config.sensor_name_rain,
-            location=self.config.location,
-        )
-        num_temperatures = len(self.topics.tel_temperature.DataType().temperatureItem)
-        self.topics.tel_temperature.set(
-            sensorName=self.config.sensor_name_temperature,
-            location=self.config.location,
-            temperatureItem=[math.nan] * num_temperatures,
-            numChannels=1,
-        )
-
-        self.air_flow_accumulator = common.accumulator.AirFlowAccumulator(
-            log=self.log, num_samples=self.config.num_samples_airflow
-        )
-
-        self.humidity_accumulator = FloatAccumulator(
-            num_samples=self.config.num_samples_temperature
-        )
-        self.pressure_accumulator = FloatAccumulator(
-            num_samples=self.config.num_samples_temperature
-        )
-        self.temperature_accumulator = FloatAccumulator(
-            num_samples=self.config.num_samples_temperature
-        )
-
-        self.mock_data_server: MockYoung32400DataServer | None = None
-
-        # Interval betweens raw data reads (sec) in simulation mode.
-        # This should equal the actual rate of the weather station
-        # if you want to publish telemetry at the standard rate.
-        self.simulation_interval = 0.5
-
-        # Raw data to use in simulation mode.
-        # By default the data is cycled (endlessly repeated).
-        # But the rain counter cannot easily cycle (other than
-        # to wrap around at 9999), so the default is "no rain".
-        wstats = Young32400RawDataGenerator(
-            mean_rain_rate=0, std_rain_rate=0, read_interval=self.simulation_interval
-        )
-        self.simulated_raw_data: collections.abc.Iterable[str] = itertools.cycle(
-            wstats.create_raw_data_list(config=self.config, num_items=100)
-        )
-
-        # Most recent new value of rain tip counter,
-        # and the time it was recorded (0 until a change is seen).
-        self.last_rain_tip_count = 0.0
-        self.last_rain_tip_timestamp = 0.0
-
-        # Has a rain tip transition been seen?
-        self.rain_tip_transition_seen = False
-
-        self.client: tcpip.Client | None = None
-
-        self.rain_stopped_timer_task = make_done_future()
-
-        # For mocking timeouts, set this to True.
-        self.do_timeout = False
-
-    @classmethod
-    def get_config_schema(cls) -> dict[str, Any]:
-        return yaml.safe_load(
-            """
 $schema: http://json-schema.org/draft-07/schema#
 description: Schema for Young32400WeatherStationDataClient.
 type: object
@@ -443,8 +284,174 @@ required:
   - scale_rain_rate
   - location
 additionalProperties: false
-"""
+""",
+    Loader=YamlLoader,
+)
+
+
+class Young32400WeatherStationDataClient(common.data_client.BaseReadLoopDataClient):
+    """Get environmental data from Young 32400 weather station
+    serial interface.
+
+    The interface is assumed to be connected to a serial-to-ethernet adapter.
+
+    Parameters
+    ----------
+    config : types.SimpleNamespace
+        The configuration, after validation by the schema returned
+        by `get_config_schema` and conversion to a types.SimpleNamespace.
+    topics : `salobj.Controller` or `types.SimpleNamespace`
+        The telemetry topics this data client can write,
+        as a struct with attributes such as ``tel_temperature``.
+    log : `logging.Logger`
+        Logger.
+    simulation_mode : `int`, optional
+        Simulation mode; 0 for normal operation.
+
+    Notes
+    -----
+    This code assumes the 32400 is configured to provide ASCII or
+    PRECIPITATION formatted output, depending if there is a rain gauge.
+
+    Sensors must be connected as follows (this is the standard order
+    for NMEA output, plus the standard input for a rain gauge):
+
+    * VIN1: temperature
+    * VIN2: relative humidity
+    * VIN3: barometric pressure
+    * VIN4: tipping bucket rain gauge
+    """
+
+    def __init__(
+        self,
+        config: types.SimpleNamespace,
+        topics: salobj.Controller | types.SimpleNamespace,
+        log: logging.Logger,
+        simulation_mode: int = 0,
+    ) -> None:
+        if config.rain_stopped_interval <= config.read_timeout:
+            raise ValueError(
+                f"{config.rain_stopped_interval=} must be > {config.read_timeout=}"
+            )
+        if config.sensor_name_dew_point and (
+            not config.sensor_name_humidity or not config.sensor_name_temperature
+        ):
+            raise ValueError(
+                f"{config.sensor_name_dew_point=} must be blank unless both "
+                f"{config.sensor_name_humidity=} and "
+                f"{config.sensor_name_temperature=} are specified"
+            )
+
+        # The MOXA serial-to-ethernet adapter connected to the Young weather
+        # station requires disconnecting and reconnecting again when the
+        # connection times out. This is achieved by setting the auto_reconnect
+        # constructor argument to True.
+        super().__init__(
+            config=config,
+            topics=topics,
+            log=log,
+            simulation_mode=simulation_mode,
+            auto_reconnect=True,
+        )
+
+        self.topics.tel_airFlow.set(
+            sensorName=self.config.sensor_name_airflow, location=self.config.location
+        )
+        self.topics.tel_dewPoint.set(
+            sensorName=self.config.sensor_name_dew_point, location=self.config.location
+        )
+        self.topics.tel_relativeHumidity.set(
+            sensorName=self.config.sensor_name_humidity, location=self.config.location
+        )
+        num_pressures = len(self.topics.tel_pressure.DataType().pressureItem)
+        self.topics.tel_pressure.set(
+            sensorName=self.config.sensor_name_pressure,
+            location=self.config.location,
+            pressureItem=[math.nan] * num_pressures,
+            numChannels=1,
+        )
+        self.topics.tel_rainRate.set(
+            sensorName=self.config.sensor_name_rain,
+            location=self.config.location,
+        )
+        num_temperatures = len(self.topics.tel_temperature.DataType().temperatureItem)
+        self.topics.tel_temperature.set(
+            sensorName=self.config.sensor_name_temperature,
+            location=self.config.location,
+            temperatureItem=[math.nan] * num_temperatures,
+            numChannels=1,
+        )
+
+        self.air_flow_accumulator = common.accumulator.AirFlowAccumulator(
+            log=self.log, num_samples=self.config.num_samples_airflow
+        )
+
+        self.humidity_accumulator = FloatAccumulator(
+            num_samples=self.config.num_samples_temperature
+        )
+        self.pressure_accumulator = FloatAccumulator(
+            num_samples=self.config.num_samples_temperature
         )
+        self.temperature_accumulator = FloatAccumulator(
+            num_samples=self.config.num_samples_temperature
+        )
+
+        # Scale and offset to convert each raw value to scaled units:
+        # scaled = raw * scale + offset.
+        self.humidity_scale, self.humidity_offset = self.config.scale_offset_humidity
+        self.pressure_scale, self.pressure_offset = self.config.scale_offset_pressure
+        (
+            self.temperature_scale,
+            self.temperature_offset,
+        ) = self.config.scale_offset_temperature
+        (
+            self.wind_direction_scale,
+            self.wind_direction_offset,
+        ) = self.config.scale_offset_wind_direction
+        (
+            self.wind_speed_scale,
+            self.wind_speed_offset,
+        ) = self.config.scale_offset_wind_speed
+
+        self.mock_data_server: MockYoung32400DataServer | None = None
+
+        # Interval betweens raw data reads (sec) in simulation mode.
+        # This should equal the actual rate of the weather station
+        # if you want to publish telemetry at the standard rate.
+        self.simulation_interval = 0.5
+
+        # Raw data to use in simulation mode.
+        # By default the data is created lazily and endlessly.
+        # The default is "no rain".
+        wstats = Young32400RawDataGenerator(
+            mean_rain_rate=0, std_rain_rate=0, read_interval=self.simulation_interval
+        )
+        self.simulated_raw_data: collections.abc.Iterable[str] = wstats.iter_raw_data(
+            config=self.config
+        )
+
+        # Most recent new value of rain tip counter,
+        # and the time it was recorded (0 until a change is seen).
+        self.last_rain_tip_count = 0.0
+        self.last_rain_tip_timestamp = 0.0
+
+        # Has a rain tip transition been seen?
+        self.rain_tip_transition_seen = False
+
+        self.client: tcpip.Client | None = None
+
+        # Timer that reports that rain has stopped, if no rain tip
+        # transition is seen before it fires, and the task it starts
+        # to write the precipitation event.
+        self.rain_stopped_timer_handle: asyncio.TimerHandle | None = None
+        self.rain_stopped_task = make_done_future()
+
+        # For mocking timeouts, set this to True.
+        self.do_timeout = False
+
+    @classmethod
+    def get_config_schema(cls) -> dict[str, Any]:
+        return CONFIG_SCHEMA
 
     @property
     def connected(self) -> bool:
@@ -477,7 +484,7 @@ additionalProperties: false
 
     async def disconnect(self) -> None:
         self.run_task.cancel()
-        self.rain_stopped_timer_task.cancel()
+        self.cancel_rain_stopped_timer()
         self.last_rain_tip_timestamp = 0.0
         self.air_flow_accumulator.clear()
         self.humidity_accumulator.clear()
@@ -523,11 +530,10 @@ additionalProperties: false
 
         if self.config.sensor_name_airflow:
             self.air_flow_accumulator.add_sample(
-                timestamp=current_tai(),
-                direction=scaled_from_raw(
-                    wind_direction, *self.config.scale_offset_wind_direction
-                ),
-                speed=scaled_from_raw(wind_speed, *self.config.scale_offset_wind_speed),
+                timestamp=timestamp,
+                direction=wind_direction * self.wind_direction_scale
+                + self.wind_direction_offset,
+                speed=wind_speed * self.wind_speed_scale + self.wind_speed_offset,
                 isok=True,
             )
             kwargs = self.air_flow_accumulator.get_topic_kwargs()
@@ -540,21 +546,16 @@ additionalProperties: false
             if raw_median is not None:
                 report_humidity = True
                 await self.topics.tel_relativeHumidity.set_write(
-                    relativeHumidityItem=scaled_from_raw(
-                        raw=raw_median,
-                        scale=self.config.scale_offset_humidity[0],
-                        offset=self.config.scale_offset_humidity[1],
-                    ),
+                    relativeHumidityItem=raw_median * self.humidity_scale
+                    + self.humidity_offset,
                     timestamp=timestamp,
                 )
 
         if self.config.sensor_name_pressure:
             raw_median = self.pressure_accumulator.add_sample(pressure)
             if raw_median is not None:
-                self.topics.tel_pressure.data.pressureItem[0] = scaled_from_raw(
-                    raw=raw_median,
-                    scale=self.config.scale_offset_pressure[0],
-                    offset=self.config.scale_offset_pressure[1],
+                self.topics.tel_pressure.data.pressureItem[0] = (
+                    raw_median * self.pressure_scale + self.pressure_offset
                 )
                 await self.topics.tel_pressure.set_write(timestamp=timestamp)
 
@@ -575,10 +576,8 @@ additionalProperties: false
         raw_median = self.temperature_accumulator.add_sample(temperature)
         if raw_median is not None:
             report_temperature = True
-            self.topics.tel_temperature.data.temperatureItem[0] = scaled_from_raw(
-                raw=raw_median,
-                scale=self.config.scale_offset_temperature[0],
-                offset=self.config.scale_offset_temperature[1],
+            self.topics.tel_temperature.data.temperatureItem[0] = (
+                raw_median * self.temperature_scale + self.temperature_offset
             )
             await self.topics.tel_temperature.set_write(timestamp=timestamp)
         return report_temperature
@@ -638,10 +637,20 @@ additionalProperties: false
                 rainRateItem=round(rain_rate_mm_per_hr)
             )
 
+    def cancel_rain_stopped_timer(self) -> None:
+        """Cancel the "rain stopped" timer and any pending report."""
+        if self.rain_stopped_timer_handle is not None:
+            self.rain_stopped_timer_handle.cancel()
+            self.rain_stopped_timer_handle = None
+        self.rain_stopped_task.cancel()
+
     def restart_rain_stopped_timer(self) -> None:
         """Start or restart the "rain stopped" timer."""
-        self.rain_stopped_timer_task.cancel()
-        self.rain_stopped_timer_task = asyncio.create_task(self.rain_stopped_timer())
+        self.cancel_rain_stopped_timer()
+        loop = asyncio.get_running_loop()
+        self.rain_stopped_timer_handle = loop.call_later(
+            self.config.rain_stopped_interval, self.rain_stopped_timer_callback
+        )
 
     async def setup_reading(self) -> None:
         # Start the "rain stopped" timer so we can report "no rain"
@@ -653,32 +662,34 @@ additionalProperties: false
 
         The format is as described by DATA_REGEX.
         """
-        assert self.client is not None  # make mypy happy
-        read_bytes = await asyncio.wait_for(
-            self.client.readuntil(tcpip.DEFAULT_TERMINATOR),
-            timeout=self.config.read_timeout,
-        )
-        data = read_bytes.decode().strip()
+        client = self.client
+        assert client is not None  # make mypy happy
+        async with asyncio.timeout(self.config.read_timeout):
+            read_bytes = await client.readuntil(tcpip.DEFAULT_TERMINATOR)
+        data = read_bytes.strip()
         if not data:
             return
         match = DATA_REGEX.fullmatch(data)
         if match is None:
             self.log.warning(f"Ignoring {data=}: could not parse the data")
             return
-        # Convert raw data values from str to int.
+        # Convert raw data values from bytes to int.
         raw_data_dict = {key: int(value) for key, value in match.groupdict().items()}
         try:
             await self.handle_data(**raw_data_dict)
         except Exception as e:
             self.log.exception(f"Failed to handle {data=}: {e!r}")
 
-    async def rain_stopped_timer(self) -> None:
-        """Wait for the configured time, then report that rain has stopped.
+    def rain_stopped_timer_callback(self) -> None:
+        """Report that rain has stopped.
 
-        Intended to be run by restart_rain_stopped_timer.
+        Intended to be called by the timer started by
+        restart_rain_stopped_timer.
         """
-        await asyncio.sleep(self.config.rain_stopped_interval)
-        await self.topics.evt_precipitation.set_write(raining=False)
+        self.rain_stopped_timer_handle = None
+        self.rain_stopped_task = asyncio.create_task(
+            self.topics.evt_precipitation.set_write(raining=False)
+        )
 
 
 @dataclasses.dataclass
@@ -734,6 +745,10 @@ class Young32400RawDataGenerator:
 
     max_rain_tip_count: int = dataclasses.field(default=9999, init=False)
 
+    # Maximum raw value of each field other than rain_rate,
+    # if different from the default of 4000.
+    max_raw_values: ClassVar[dict[str, int]] = dict(wind_direction=3600)
+
     def create_raw_data_list(
         self, config: types.SimpleNamespace, num_items: int, random_seed: int = 47
     ) -> list[str]:
@@ -750,22 +765,75 @@ class Young32400RawDataGenerator:
         random_seed : `int`
             Random seed.
         """
-        rng = numpy.random.default_rng(random_seed)
-        float_array_dict = {
-            field_name: rng.normal(
-                loc=getattr(self, "mean_" + field_name),
-                scale=getattr(self, "std_" + field_name),
-                size=num_items,
+        rng = numpy.random.Generator(numpy.random.PCG64DXSM(random_seed))
+        raw_data_list, _ = self._create_raw_data(
+            config=config,
+            num_items=num_items,
+            rng=rng,
+            start_rain_tip_count=self.start_rain_tip_count,
+        )
+        return raw_data_list
+
+    def iter_raw_data(
+        self,
+        config: types.SimpleNamespace,
+        chunk_size: int = 100,
+        random_seed: int = 47,
+    ) -> collections.abc.Iterator[str]:
+        """Endlessly yield simulated raw data for all sensors.
+
+        The data is created lazily, ``chunk_size`` items at a time,
+        and the rain tip count continues from one chunk to the next.
+
+        Parameters
+        ----------
+        config : `types.SimpleNamespace`
+            Configuration for the data client.
+        chunk_size : `int`
+            Number of raw strings to create at a time.
+        random_seed : `int`
+            Random seed.
+        """
+        rng = numpy.random.Generator(numpy.random.PCG64DXSM(random_seed))
+        rain_tip_count: float = self.start_rain_tip_count
+        while True:
+            raw_data_list, rain_tip_count = self._create_raw_data(
+                config=config,
+                num_items=chunk_size,
+                rng=rng,
+                start_rain_tip_count=rain_tip_count,
             )
-            for field_name in self.stat_names
-        }
+            yield from raw_data_list
+
+    def _create_raw_data(
+        self,
+        config: types.SimpleNamespace,
+        num_items: int,
+        rng: numpy.random.Generator,
+        start_rain_tip_count: float,
+    ) -> tuple[list[str], float]:
+        """Create simulated raw data for all sensors.
+
+        Return the raw strings and the final (unrounded) rain tip count.
+        """
+        # Draw the values for all fields at once; the result has one column
+        # per field, in stat_names order.
+        float_arrays = rng.normal(
+            loc=[getattr(self, "mean_" + field_name) for field_name in self.stat_names],
+            scale=[
+                getattr(self, "std_" + field_name) for field_name in self.stat_names
+            ],
+            size=(num_items, len(self.stat_names)),
+        )
+        float_array_dict = dict(zip(self.stat_names, float_arrays.T))
 
         # Wrap wind direction into [0, 360)
-        wind_direction = float_array_dict["wind_direction"]
-        wind_direction = Angle(wind_direction * u.deg).wrap_at(Angle(360 * u.deg)).deg
-        float_array_dict["wind_direction"] = wind_direction
+        float_array_dict["wind_direction"] = np.mod(
+            float_array_dict["wind_direction"], 360
+        )
 
         # Create string lists
+        end_rain_tip_count = start_rain_tip_count
         str_list_dict: dict[str, list[str]] = dict()
         for field_name, float_array in float_array_dict.items():
             if field_name == "rain_rate":
@@ -773,27 +841,28 @@ class Young32400RawDataGenerator:
                 # so scale mm/hr to counts/sample.
                 samples_per_hour = SECONDS_PER_HOUR / self.read_interval
                 counts_per_mm = 1 / config.scale_rain_rate
-                unscaled_float_array = float_array * counts_per_mm / samples_per_hour
-                unscaled_float_array = np.cumsum(unscaled_float_array)
-                unscaled_float_array += self.start_rain_tip_count
-                unscaled_float_array %= self.max_rain_tip_count
+                # Work in place; float_array is not used again.
+                float_array *= counts_per_mm / samples_per_hour
+                np.cumsum(float_array, out=float_array)
+                float_array += start_rain_tip_count
+                np.mod(float_array, self.max_rain_tip_count, out=float_array)
+                unscaled_float_array = float_array
+                if num_items > 0:
+                    end_rain_tip_count = float(float_array[-1])
+                max_int = self.max_rain_tip_count
             else:
                 scale, offset = getattr(config, "scale_offset_" + field_name)
                 unscaled_float_array = (float_array - offset) / scale
-            max_int = dict(
-                wind_direction=3600,
-                rain_rate=self.max_rain_tip_count,
-            ).get(field_name, 4000)
+                max_int = self.max_raw_values.get(field_name, 4000)
 
-            str_list_dict[field_name] = [
-                float_to_intstr(value=value, max_int=max_int)
-                for value in unscaled_float_array
-            ]
+            # Round and truncate all values at once, then format them
+            # as 4 character integers with leading zeros.
+            int_array = np.clip(np.rint(unscaled_float_array), 0, max_int).astype(int)
+            str_list_dict[field_name] = [f"{value:04d}" for value in int_array.tolist()]
 
-        return [
-            " ".join(str_list[i] for str_list in str_list_dict.values())
-            for i in range(num_items)
-        ]
+        # Transpose the per-field columns into rows.
+        raw_data_list = [" ".join(row) for row in zip(*str_list_dict.values())]
+        return raw_data_list, end_rain_tip_count
 
 
 class MockYoung32400DataServer(tcpip.OneClientServer):
@@ -849,8 +918,9 @@ class MockYoung32400DataServer(tcpip.OneClientServer):
             self.log.info(
                 "Mock server ran out of simulated data; repeating the final value"
             )
+            final_frame = data.encode() + tcpip.DEFAULT_TERMINATOR
             while self.connected:
-                await self.write(data.encode() + tcpip.DEFAULT_TERMINATOR)
+                await self.write(final_frame)
                 await asyncio.sleep(self.simulation_interval)
         except Exception as e:
             self.log.exception(f"write loop failed: {e!r}")
@@ -28,6 +28,9 @@ import numpy as np
 import pytest
 from lsst.ts import salobj, utils
 from lsst.ts.ess import csc
+from lsst.ts.ess.csc.data_client.siglent_ssa3000x_spectrum_analyzer_data_client import (
+    EXPECTED_NUMBER_OF_DATA_POINTS,
+)
 
 
 class SiglentSSA3000xDataClientTestCase(unittest.IsolatedAsyncioTestCase):
@@ -98,3 +101,24 @@ class SiglentSSA3000xDataClientTestCase(unittest.IsolatedAsyncioTestCase):
                 assert np.amin(telemetry.spectrum) >= -100.0
             finally:
                 await data_client.stop()
+
+    async def test_unparsable_data(self) -> None:
+        async with self.create_controller():
+            data_client = self.create_data_client()
+
+            await data_client.connect()
+            try:
+                assert data_client.mock_data_server is not None
+                # A trace with the expected number of fields,
+                # one of which cannot be parsed.
+                values = ["-50.000"] * EXPECTED_NUMBER_OF_DATA_POINTS
+                values[10] = "x"
+                data_client.mock_data_server.trace_data = (
+                    ", ".join(values).encode() + b"\r\n"
+                )
+                with pytest.raises(
+                    RuntimeError, match="Could not parse all the data points"
+                ):
+                    await data_client.read_data()
+            finally:
+                await data_client.disconnect()
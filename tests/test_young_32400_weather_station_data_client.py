@@ -22,6 +22,7 @@
 import asyncio
 import collections.abc
 import contextlib
+import itertools
 import math
 import pathlib
 import types
@@ -33,6 +34,9 @@ import pytest
 from lsst.ts import salobj, utils
 from lsst.ts.ess import common, csc
 from lsst.ts.ess.common.sensor import compute_dew_point_magnus
+from lsst.ts.ess.csc.data_client.young_32400_weather_station_data_client import (
+    FloatAccumulator,
+)
 
 PathT: TypeAlias = str | pathlib.Path
 
@@ -100,6 +104,21 @@ class Young32400DataClientTestCase(unittest.IsolatedAsyncioTestCase):
             simulation_mode=True,
         )
 
+    def test_float_accumulator(self) -> None:
+        with pytest.raises(ValueError):
+            FloatAccumulator(num_samples=0)
+
+        rng = np.random.default_rng(47)
+        for num_samples in (1, 2, 3, 4, 19, 20):
+            accumulator = FloatAccumulator(num_samples=num_samples)
+            for _ in range(3):
+                values = rng.integers(0, 4000, size=num_samples).tolist()
+                for value in values[:-1]:
+                    assert accumulator.add_sample(value) is None
+                median = accumulator.add_sample(values[-1])
+                assert isinstance(median, float)
+                assert median == pytest.approx(np.median(values))
+
     async def test_raw_data_generator(self) -> None:
         field_name_index = {
             field_name: i
@@ -196,6 +215,53 @@ class Young32400DataClientTestCase(unittest.IsolatedAsyncioTestCase):
                 assert mean == pytest.approx(expected_mean, abs=expected_std)
                 assert std == pytest.approx(expected_std, rel=0.1)
 
+    def test_iter_raw_data(self) -> None:
+        config = self.default_config
+        rain_index = csc.Young32400RawDataGenerator.stat_names.index("rain_rate")
+        num_items = 100
+        # Rain at 0.1 counts per sample, starting close enough to the maximum
+        # rain tip count that the count wraps around once.
+        data_gen = csc.Young32400RawDataGenerator(
+            mean_rain_rate=360,
+            std_rain_rate=0,
+            read_interval=0.1,
+        )
+        max_rain_tip_count = data_gen.max_rain_tip_count
+        raw_data = list(
+            itertools.islice(
+                data_gen.iter_raw_data(config=config, chunk_size=7), num_items
+            )
+        )
+        assert len(raw_data) == num_items
+        expected_raw_data = data_gen.create_raw_data_list(
+            config=config, num_items=num_items
+        )
+        rain_tip_counts = []
+        for item, expected_item in zip(raw_data, expected_raw_data):
+            fields = item.split()
+            expected_fields = expected_item.split()
+            rain_tip_counts.append(int(fields.pop(rain_index)))
+            expected_rain_tip_count = int(expected_fields.pop(rain_index))
+            # Data other than the rain tip count should not depend
+            # on the chunk size.
+            assert fields == expected_fields
+            # The rain tip count should continue from one chunk to the next.
+            # Allow for rounding differences in the accumulated count.
+            rain_tip_count_diff = (
+                rain_tip_counts[-1] - expected_rain_tip_count
+            ) % max_rain_tip_count
+            assert rain_tip_count_diff in (0, 1, max_rain_tip_count - 1)
+
+        # The rain tip count should never decrease, except when it wraps.
+        num_wraps = 0
+        for prev_count, count in zip(rain_tip_counts[:-1], rain_tip_counts[1:]):
+            if count < prev_count:
+                num_wraps += 1
+            assert (count - prev_count) % max_rain_tip_count in (0, 1)
+        assert num_wraps == 1
+        assert rain_tip_counts[0] == data_gen.start_rain_tip_count
+        assert rain_tip_counts[-1] == 1
+
     async def test_operation(self) -> None:
         async with self.create_controller():
             config = self.default_config